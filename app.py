@@ -2,11 +2,12 @@ import streamlit as st
 import pandas as pd
 import chardet
 import plotly.express as px
-from sklearn.preprocessing import LabelEncoder
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 import io
+from data_query import load_frame, render_query_panel
+from data_profile import render_profile
 
 # ========== 載入 API 金鑰 ==========
 load_dotenv()
@@ -119,11 +120,11 @@ elif app_mode == "📊 資料集分析工具":
 
     if uploaded_file:
         try:
-            df = pd.read_csv(uploaded_file)
+            df = load_frame(uploaded_file)
             st.success("✅ 成功載入資料！")
 
             if show_preview:
-                tab1, tab2, tab3 = st.tabs(["🔍 資料預覽", "📊 敘述統計", "🧩 欄位篩選"])
+                tab1, tab2, tab3, tab4 = st.tabs(["🔍 資料預覽", "📊 敘述統計", "🧩 欄位篩選", "🗂️ 查詢面板"])
 
                 with tab1:
                     st.subheader("🔍 預覽前幾列")
@@ -133,10 +134,17 @@ elif app_mode == "📊 資料集分析工具":
                     st.subheader("📊 資料敘述統計")
                     st.write(df.describe())
 
+                    st.subheader("🧬 完整欄位剖析")
+                    render_profile(df)
+
                 with tab3:
                     st.subheader("🧩 欄位篩選器")
                     column = st.selectbox("請選擇要顯示的欄位", df.columns)
                     st.dataframe(df[[column]].head(num_rows), use_container_width=True)
+
+                with tab4:
+                    st.subheader("🗂️ 篩選、排序與分組")
+                    render_query_panel(df)
             else:
                 st.warning("📌 資料內容目前已被隱藏。請在左側勾選『顯示資料預覽』查看資料。")
 
@@ -0,0 +1,273 @@
+"""
+資料集完整剖析：每個欄位的缺值率、基數、前 k 名數值、直方圖、離群值，以及標籤編碼後的相關係數矩陣
+
+各欄位交給 process pool 平行處理：worker 負責標籤編碼並計算統計，編碼結果寫進共享記憶體中的
+float64 矩陣；每完成一個欄位就更新畫面，全部完成後再用這個矩陣以向量化方式算相關係數。
+
+數值欄位由主程序直接寫進共享記憶體；非數值欄位則是整欄 pickle 給 worker。字串長度不固定，
+放不進固定寬度的共享緩衝區，若在主程序先做 factorize，最花時間的雜湊與排序又會回到單核，
+所以這裡用傳輸成本換取編碼的平行化。/dev/shm 放不下整個矩陣時改在主程序逐欄計算。
+"""
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+TOP_K = 10
+HIST_BINS = 20
+PARALLEL_MIN_CELLS = 1_000_000  # 資料量太小時直接在主程序計算，省下開 process 的成本
+CORR_CHUNK_BYTES = 32 * 1024 * 1024  # 相關係數分段累加時，每段暫存陣列的大小上限
+SHM_DIR = "/dev/shm"
+
+
+# ===============================
+# 欄位編碼
+# ===============================
+def is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def encode_column(series):
+    """回傳 (類型, 數值陣列, 標籤)；非數值欄位以標籤編碼，缺值為 -1"""
+    if is_numeric(series):
+        return "numeric", series.to_numpy(dtype=np.float64, na_value=np.nan), None
+    codes, labels = pd.factorize(series, sort=True)
+    return "category", codes.astype(np.int64), labels
+
+
+def column_stats(kind, values, top_k=TOP_K, bins=HIST_BINS):
+    """單一欄位的統計（純 NumPy，主程序與 worker 共用）"""
+    n = len(values)
+    if kind == "numeric":
+        valid = values[~np.isnan(values)]
+        uniq, counts = np.unique(valid, return_counts=True)
+        top = np.argsort(-counts, kind="stable")[:top_k]
+        stats = {
+            "nulls": n - len(valid),
+            "cardinality": len(uniq),
+            "top": list(zip(uniq[top].tolist(), counts[top].tolist())),
+            "hist": None,
+            "outliers": None,
+        }
+        finite = valid[np.isfinite(valid)]
+        if len(finite):
+            hist, edges = np.histogram(finite, bins=bins)
+            q1, q3 = np.percentile(finite, [25, 75])
+            lo, hi = float(q1 - 1.5 * (q3 - q1)), float(q3 + 1.5 * (q3 - q1))
+            stats["hist"] = (hist.tolist(), edges.tolist())
+            stats["outliers"] = (int(((finite < lo) | (finite > hi)).sum()), lo, hi)
+        return stats
+
+    valid = values[values >= 0]
+    counts = np.bincount(valid)
+    top = np.argsort(-counts, kind="stable")[:top_k]
+    top = top[counts[top] > 0]
+    return {
+        "nulls": n - len(valid),
+        "cardinality": int((counts > 0).sum()),
+        "top": list(zip(top.tolist(), counts[top].tolist())),
+        "hist": None,
+        "outliers": None,
+    }
+
+
+# ===============================
+# 共享記憶體與平行計算
+# ===============================
+def _profile_column(row, series, top_k, bins):
+    """計算單一欄位統計，並把編碼後的值寫進 row（float64，缺值為 NaN）
+
+    series 為 None 表示數值欄位，主程序已經寫好 row。
+    """
+    if series is None:
+        return "numeric", column_stats("numeric", row, top_k, bins)
+    kind, values, labels = encode_column(series)
+    row[:] = values if kind == "numeric" else np.where(values < 0, np.nan, values)
+    stats = column_stats(kind, values, top_k, bins)
+    if labels is not None:
+        stats["top"] = [(labels[code], count) for code, count in stats["top"]]
+    return kind, stats
+
+
+def _profile_shared(name, shape, index, series, top_k, bins):
+    shm = SharedMemory(name=name)
+    try:
+        return _profile_column(np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[index], series, top_k, bins)
+    finally:
+        shm.close()
+
+
+def shared_memory_fits(nbytes):
+    """/dev/shm 寫滿會觸發 SIGBUS 直接結束程序，所以事先確認空間（保留一成餘裕）"""
+    if not os.path.isdir(SHM_DIR):
+        return True
+    return nbytes <= shutil.disk_usage(SHM_DIR).free * 0.9
+
+
+def _finish(col, kind, n, stats):
+    stats.update(column=col, kind=kind, null_rate=stats["nulls"] / n if n else 0.0)
+    return stats
+
+
+def _submit_columns(df, matrix):
+    """數值欄位直接寫進矩陣（便宜），其他欄位整欄交給 worker 編碼"""
+    for i in range(len(df.columns)):
+        series = df.iloc[:, i]
+        if is_numeric(series):
+            matrix[i] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            series = None
+        yield i, series
+
+
+def profile_frame(df, top_k=TOP_K, bins=HIST_BINS, max_workers=None):
+    """逐欄計算統計，每完成一欄就 yield (欄位, 結果)，最後 yield (None, 相關係數矩陣)"""
+    n, p = df.shape
+
+    if n * p < PARALLEL_MIN_CELLS or not shared_memory_fits(n * p * 8):
+        matrix = np.empty((p, n), dtype=np.float64)
+        for i, series in _submit_columns(df, matrix):
+            kind, stats = _profile_column(matrix[i], series, top_k, bins)
+            yield df.columns[i], _finish(df.columns[i], kind, n, stats)
+        yield None, correlation_matrix(matrix, df.columns)
+        return
+
+    shm = SharedMemory(create=True, size=max(n * p * 8, 1))
+    pool = None
+    try:
+        matrix = np.ndarray((p, n), dtype=np.float64, buffer=shm.buf)
+        workers = max_workers or min(os.cpu_count() or 1, p)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        futures = {
+            pool.submit(_profile_shared, shm.name, (p, n), i, series, top_k, bins): i
+            for i, series in _submit_columns(df, matrix)
+        }
+        for future in as_completed(futures):
+            col = df.columns[futures[future]]
+            kind, stats = future.result()
+            yield col, _finish(col, kind, n, stats)
+
+        yield None, correlation_matrix(matrix, df.columns)
+    finally:
+        # 提前結束（例如 Streamlit 重跑）時取消還在排隊的欄位，只等正在跑的幾欄
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        matrix = None
+        shm.close()
+        shm.unlink()
+
+
+def correlation_matrix(matrix, columns):
+    """標籤編碼後的 Pearson 相關係數；每一對欄位只用兩者都有值的列（與 DataFrame.corr 相同）
+
+    matrix 形狀為 (欄位數, 列數)，缺值為 NaN。以矩陣乘法分段累加各對欄位的
+    筆數、和、平方和與交叉乘積，不必逐對計算。
+    """
+    p, n = matrix.shape
+    chunk = max(1, CORR_CHUNK_BYTES // (p * 8))
+    valid = np.zeros(p)
+    total = np.zeros(p)
+    for start in range(0, n, chunk):
+        block = matrix[:, start:start + chunk]
+        mask = ~np.isnan(block)
+        valid += mask.sum(axis=1)
+        total += np.where(mask, block, 0.0).sum(axis=1)
+    means = np.divide(total, valid, out=np.zeros(p), where=valid > 0)
+
+    count = np.zeros((p, p))
+    sums = np.zeros((p, p))
+    squares = np.zeros((p, p))
+    cross = np.zeros((p, p))
+    for start in range(0, n, chunk):
+        block = matrix[:, start:start + chunk]
+        mask = ~np.isnan(block)
+        m = mask.astype(np.float64)
+        x = np.where(mask, block - means[:, None], 0.0)
+        count += m @ m.T
+        sums += x @ m.T          # sums[i, j]：欄位 i 在 i、j 都有值的列上的和
+        squares += (x * x) @ m.T
+        cross += x @ x.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = cross - sums * sums.T / count
+        var = squares - sums ** 2 / count
+        corr = cov / np.sqrt(var * var.T)
+    return pd.DataFrame(np.clip(corr, -1, 1), index=columns, columns=columns)
+
+
+# ===============================
+# Streamlit 介面
+# ===============================
+def _summary_row(stats):
+    outliers = stats["outliers"]
+    return {
+        "欄位": stats["column"],
+        "類型": "數值" if stats["kind"] == "numeric" else "類別",
+        "缺值率": f"{stats['null_rate']:.1%}",
+        "基數": stats["cardinality"],
+        "最常見值": str(stats["top"][0][0]) if stats["top"] else "",
+        "離群值數": outliers[0] if outliers else None,
+        "⚠️": "🚩" if outliers and outliers[0] else "",
+    }
+
+
+def _render_column(stats):
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(f"**前 {len(stats['top'])} 名數值**")
+        top = pd.DataFrame(stats["top"], columns=["值", "次數"])
+        top["值"] = top["值"].astype(str)
+        st.plotly_chart(px.bar(top, x="值", y="次數"), use_container_width=True)
+    with c2:
+        if stats["hist"]:
+            hist, edges = stats["hist"]
+            centers = [(a + b) / 2 for a, b in zip(edges[:-1], edges[1:])]
+            st.markdown("**直方圖**")
+            st.plotly_chart(px.bar(x=centers, y=hist, labels={"x": stats["column"], "y": "次數"}),
+                            use_container_width=True)
+            count, lo, hi = stats["outliers"]
+            st.caption(f"離群值（IQR 法，< {lo:.4g} 或 > {hi:.4g}）：{count} 筆")
+
+
+def render_profile(df):
+    """平行剖析所有欄位，逐欄更新摘要表，最後顯示相關係數矩陣"""
+    store = st.session_state.get("profile_store")
+    if store is None or store["df"] is not df:
+        if not st.button("🚀 開始剖析所有欄位"):
+            return
+        n, p = df.shape
+        if n * p >= PARALLEL_MIN_CELLS and not shared_memory_fits(n * p * 8):
+            st.info(f"ℹ️ 共享記憶體（{SHM_DIR}）空間不足，改在單一程序逐欄剖析，速度會比較慢。")
+        store = {"df": df, "results": {}, "corr": None}
+        progress = st.progress(0.0, text="剖析中...")
+        table = st.empty()
+        rows = []
+        for col, result in profile_frame(df):
+            if col is None:
+                store["corr"] = result
+                continue
+            store["results"][col] = result
+            rows.append(_summary_row(result))
+            table.dataframe(pd.DataFrame(rows), use_container_width=True)
+            if len(rows) < len(df.columns):
+                progress.progress(len(rows) / len(df.columns), text=f"剖析中...（{len(rows)}/{len(df.columns)}）")
+            else:
+                progress.progress(1.0, text="欄位剖析完成，計算相關係數矩陣中...")
+        progress.empty()
+        table.empty()
+        st.session_state["profile_store"] = store
+
+    results = store["results"]
+    st.dataframe(pd.DataFrame([_summary_row(results[c]) for c in df.columns]), use_container_width=True)
+
+    column = st.selectbox("查看欄位細節", df.columns, key="profile_column")
+    _render_column(results[column])
+
+    st.markdown("**相關係數矩陣（類別欄位以標籤編碼）**")
+    st.plotly_chart(px.imshow(store["corr"], zmin=-1, zmax=1, color_continuous_scale="RdBu_r"),
+                    use_container_width=True)
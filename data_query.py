@@ -0,0 +1,193 @@
+"""
+資料集查詢面板：欄位篩選、排序、分組彙總、分頁顯示
+
+篩選與排序都以 pandas / NumPy 向量化運算完成；排序索引與類別代碼會快取在
+st.session_state，之後每次互動只需要做遮罩與切片，再把一頁資料交給 st.dataframe。
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CATEGORY_MAX = 1000             # 不重複值不超過這個數量的文字欄位轉成 category
+SORT_CACHE_SIZE = 4             # 最多快取幾組排序索引（每組約 n 個整數）
+PAGE_SIZES = [25, 50, 100, 500]
+AGG_FUNCS = {
+    "筆數": "size",
+    "總和": "sum",
+    "平均": "mean",
+    "最小": "min",
+    "最大": "max",
+    "不重複數": "nunique",
+}
+
+
+# ===============================
+# 資料載入與快取
+# ===============================
+def prepare_frame(df):
+    """把低基數的文字欄位轉成 category，篩選時直接比對整數代碼"""
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col].dtype) and df[col].nunique(dropna=True) <= CATEGORY_MAX:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def load_frame(uploaded_file):
+    """同一個上傳檔案只讀取、轉換一次，排序索引也跟著快取"""
+    key = uploaded_file.file_id  # 每次上傳都不同，同名同大小的新檔也會重新讀取
+    store = st.session_state.get("query_store")
+    if store is None or store["key"] != key:
+        df = prepare_frame(pd.read_csv(uploaded_file))
+        store = {"key": key, "df": df, "sort_cache": OrderedDict()}
+        st.session_state["query_store"] = store
+    return store["df"]
+
+
+def _sort_cache(df):
+    store = st.session_state.get("query_store")
+    if store is not None and store["df"] is df:
+        return store["sort_cache"]
+    return OrderedDict()
+
+
+# ===============================
+# 向量化查詢
+# ===============================
+def build_mask(df, filters):
+    """filters: [(欄位, 類型, 值), ...]，回傳布林陣列"""
+    mask = np.ones(len(df), dtype=bool)
+    for col, kind, value in filters:
+        series = df[col]
+        if kind == "category":
+            codes = series.cat.categories.get_indexer(value)
+            mask &= np.isin(series.cat.codes.to_numpy(), codes)
+        elif kind == "values":
+            mask &= series.isin(value).to_numpy()
+        elif kind == "range":
+            lo, hi = value
+            arr = series.to_numpy(dtype=float, na_value=np.nan)
+            mask &= (arr >= lo) & (arr <= hi)
+        elif kind == "contains" and value:
+            mask &= series.astype(str).str.contains(value, case=False, regex=False).to_numpy()
+    return mask
+
+
+def sort_order(df, col, ascending, cache):
+    """回傳排序後的列位置；最近用過的幾組排序會留在快取裡"""
+    key = (col, ascending)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    s = df[col].reset_index(drop=True)
+    # 混合型別的文字欄位無法直接比較大小，改用字串排序（缺值仍排在最後）
+    sort_key = (lambda x: x.astype(str).where(x.notna())) if s.dtype == object else None
+    order = s.sort_values(ascending=ascending, kind="stable", na_position="last", key=sort_key).index.to_numpy()
+    cache[key] = order.astype(np.int32) if len(order) < 2 ** 31 else order
+    while len(cache) > SORT_CACHE_SIZE:
+        cache.popitem(last=False)
+    return cache[key]
+
+
+def run_query(df, filters, sort_col=None, ascending=True, cache=None):
+    """回傳符合條件的列位置（已依排序欄位排好）"""
+    mask = build_mask(df, filters)
+    if sort_col is None:
+        return np.flatnonzero(mask)
+    order = sort_order(df, sort_col, ascending, OrderedDict() if cache is None else cache)
+    return order[mask[order]]
+
+
+def get_page(df, positions, page, page_size):
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+
+def group_aggregate(df, positions, by, value_col, func):
+    """對篩選後的資料做分組彙總"""
+    subset = df if len(positions) == len(df) else df.iloc[positions]
+    grouped = subset.groupby(by, observed=True, dropna=False)
+    if func == "size":
+        return grouped.size().reset_index(name="筆數")
+    values = subset[value_col]
+    if func in ("min", "max") and not pd.api.types.is_numeric_dtype(values):
+        # 無序類別與混合型別欄位無法比大小，改用字串比較
+        keys = [subset[c] for c in by]
+        return values.astype(str).where(values.notna()).groupby(keys, observed=True, dropna=False).agg(func).reset_index()
+    return grouped[value_col].agg(func).reset_index()
+
+
+# ===============================
+# Streamlit 介面
+# ===============================
+def _filter_widget(df, col):
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        value = st.multiselect(f"{col}：包含值", list(series.cat.categories), key=f"qf_{col}")
+        return (col, "category", value) if value else None
+    if pd.api.types.is_bool_dtype(series):
+        value = st.multiselect(f"{col}：包含值", [True, False], key=f"qf_{col}")
+        return (col, "values", value) if value else None
+    if pd.api.types.is_numeric_dtype(series):
+        lo, hi = series.min(), series.max()
+        if pd.isna(lo) or lo == hi:
+            st.caption(f"{col}：只有單一值，略過篩選")
+            return None
+        value = st.slider(f"{col}：範圍", float(lo), float(hi), (float(lo), float(hi)), key=f"qf_{col}")
+        return (col, "range", value) if value != (float(lo), float(hi)) else None
+    value = st.text_input(f"{col}：包含文字", key=f"qf_{col}")
+    return (col, "contains", value) if value else None
+
+
+def _page_selector(total, page_size, key):
+    """頁數輸入框；資料筆數變少時自動回到第 1 頁"""
+    n_pages = max(1, -(-total // page_size))
+    if st.session_state.get(key, 1) > n_pages:
+        st.session_state[key] = 1
+    return st.number_input(f"頁數（共 {n_pages} 頁）", min_value=1, max_value=n_pages, key=key)
+
+
+def render_query_panel(df):
+    """查詢面板：篩選 → 排序 → 分頁顯示，另附分組彙總"""
+    filter_cols = st.multiselect("🔎 篩選欄位", df.columns, key="q_filter_cols")
+    filters = []
+    for col in filter_cols:
+        f = _filter_widget(df, col)
+        if f:
+            filters.append(f)
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        sort_col = st.selectbox("排序欄位", ["（不排序）"] + list(df.columns), key="q_sort_col")
+    with c2:
+        ascending = st.radio("排序方式", ["遞增", "遞減"], horizontal=True, key="q_sort_dir") == "遞增"
+    with c3:
+        page_size = st.selectbox("每頁筆數", PAGE_SIZES, key="q_page_size")
+
+    sort_col = None if sort_col == "（不排序）" else sort_col
+    positions = run_query(df, filters, sort_col, ascending, _sort_cache(df))
+
+    total = len(positions)
+    page = _page_selector(total, page_size, "q_page")
+    st.caption(f"符合條件：{total:,} / {len(df):,} 筆")
+    st.dataframe(get_page(df, positions, page, page_size), use_container_width=True)
+
+    with st.expander("📐 分組彙總"):
+        by = st.multiselect("分組欄位", df.columns, key="q_group_by")
+        func_label = st.selectbox("彙總方式", list(AGG_FUNCS.keys()), key="q_agg_func")
+        func = AGG_FUNCS[func_label]
+        value_col = None
+        if func != "size":
+            candidates = [c for c in df.columns if c not in by]
+            if func in ("sum", "mean"):
+                candidates = [c for c in candidates if pd.api.types.is_numeric_dtype(df[c])]
+            value_col = st.selectbox("彙總欄位", candidates, key="q_agg_col")
+        if by and (func == "size" or value_col):
+            result = group_aggregate(df, positions, by, value_col, func)
+            group_page = _page_selector(len(result), page_size, "q_group_page")
+            st.caption(f"共 {len(result):,} 組")
+            st.dataframe(get_page(result, np.arange(len(result)), group_page, page_size), use_container_width=True)
+        else:
+            st.info("請選擇分組欄位與彙總欄位。")
@@ -0,0 +1,256 @@
+"""
+離線預先計算：城市生活機能密度網格
+
+用法：
+    python density_grid.py --bbox 25.00,121.45,25.10,121.60 --out taipei_grid.npz
+
+bbox 順序為 south,west,north,east（與 Overpass 相同）。
+產生的 .npz 可以讓任何地址以 O(1) 查表取得各類別數量，也可以畫成熱度圖。
+"""
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+import requests
+
+# ===============================
+# 支援查詢的 OSM Tags（powline 的即時查詢也用這一份）
+# ===============================
+OSM_TAGS = {
+    "交通": {"public_transport": "stop_position"},
+    "超商": {"shop": "convenience"},
+    "餐廳": {"amenity": "restaurant"},
+    "學校": {"amenity": "school"},
+    "醫院": {"amenity": "hospital"},
+    "藥局": {"amenity": "pharmacy"}
+}
+
+CELL_SIZE = 25                  # 每格邊長（公尺）
+DEFAULT_RADII = (200, 500, 1000)
+METERS_PER_DEG_LAT = 111320
+
+
+# ===============================
+# POI 抓取與快取
+# ===============================
+def fetch_osm_pois(bbox):
+    """一次抓取 bbox 內所有類別的 POI，回傳 {類別: [(名稱, lat, lng), ...]}"""
+    south, west, north, east = bbox
+    query_parts = []
+    for tag_dict in OSM_TAGS.values():
+        for k, v in tag_dict.items():
+            query_parts.append(f"""
+              node["{k}"="{v}"]({south},{west},{north},{east});
+              way["{k}"="{v}"]({south},{west},{north},{east});
+              relation["{k}"="{v}"]({south},{west},{north},{east});
+            """)
+    query = f"""
+    [out:json][timeout:180];
+    (
+        {"".join(query_parts)}
+    );
+    out center;
+    """
+    r = requests.post("https://overpass-api.de/api/interpreter", data=query.encode("utf-8"), timeout=200)
+    data = r.json()
+
+    results = {k: [] for k in OSM_TAGS.keys()}
+    for el in data.get("elements", []):
+        tags = el.get("tags", {})
+        name = tags.get("name", "未命名")
+        lat = el.get("lat", el.get("center", {}).get("lat"))
+        lng = el.get("lon", el.get("center", {}).get("lon"))
+        if lat is None or lng is None:
+            continue
+        for label, tag_dict in OSM_TAGS.items():
+            for k, v in tag_dict.items():
+                if tags.get(k) == v:
+                    results[label].append((name, lat, lng))
+    return results
+
+
+def load_or_fetch_pois(bbox, cache_path):
+    """有快取就讀快取，否則向 Overpass 查詢並寫入快取"""
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("bbox") == list(bbox):
+            return {k: [tuple(p) for p in v] for k, v in cached["pois"].items()}
+
+    pois = fetch_osm_pois(bbox)
+    if cache_path:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"bbox": list(bbox), "pois": pois}, f, ensure_ascii=False)
+    return pois
+
+
+# ===============================
+# 網格與圓形範圍加總
+# ===============================
+def pad_bbox(bbox, meters):
+    """把 bbox 往四周各擴張 meters 公尺，讓邊界附近的點也有完整的周邊範圍"""
+    south, west, north, east = bbox
+    lat0 = (south + north) / 2
+    d_lat = meters / METERS_PER_DEG_LAT
+    d_lng = meters / (METERS_PER_DEG_LAT * math.cos(math.radians(lat0)))
+    return (south - d_lat, west - d_lng, north + d_lat, east + d_lng)
+
+
+def _disk_offsets(radius, cell_size):
+    """圓形範圍內每一列的位移 dy 與左右半寬 w（以格中心距離判斷）"""
+    k = int(radius // cell_size)
+    return [(dy, int(math.sqrt(radius ** 2 - (dy * cell_size) ** 2) // cell_size)) for dy in range(-k, k + 1)]
+
+
+def _disk_sums(counts, radius, cell_size):
+    """每一格周邊半徑 radius 公尺內的加總：用每列的前綴和，一列一次就能取出一段區間"""
+    ny, nx = counts.shape[-2:]
+    row_sums = np.pad(counts.cumsum(axis=-1), [(0, 0)] * (counts.ndim - 1) + [(1, 0)])
+    cols = np.arange(nx)
+    out = np.zeros_like(counts)
+    for dy, w in _disk_offsets(radius, cell_size):
+        c0 = np.clip(cols - w, 0, nx)
+        c1 = np.clip(cols + w + 1, 0, nx)
+        src = slice(max(dy, 0), ny - max(-dy, 0))
+        dst = slice(max(-dy, 0), ny - max(dy, 0))
+        out[..., dst, :] += row_sums[..., src, c1] - row_sums[..., src, c0]
+    return out
+
+
+def build_grid(pois, bbox, cell_size=CELL_SIZE, radii=DEFAULT_RADII):
+    """把 POI 落到網格上，並預先算好各半徑的周邊數量
+
+    網格涵蓋 bbox 再往外擴 max(radii) + 一格，pois 也要用同樣擴張後的範圍抓取。
+    """
+    south, west, north, east = grid_bbox = pad_bbox(bbox, max(radii) + cell_size)
+    lat0 = (south + north) / 2
+    cell_lat = cell_size / METERS_PER_DEG_LAT
+    cell_lng = cell_size / (METERS_PER_DEG_LAT * math.cos(math.radians(lat0)))
+    ny = max(1, math.ceil((north - south) / cell_lat))
+    nx = max(1, math.ceil((east - west) / cell_lng))
+
+    labels = list(OSM_TAGS.keys())
+    counts = np.zeros((len(labels), ny, nx), dtype=np.int32)
+    for i, label in enumerate(labels):
+        points = pois.get(label, [])
+        if not points:
+            continue
+        lats = np.array([p[1] for p in points])
+        lngs = np.array([p[2] for p in points])
+        rows = ((lats - south) / cell_lat).astype(int)
+        cols = ((lngs - west) / cell_lng).astype(int)
+        inside = (rows >= 0) & (rows < ny) & (cols >= 0) & (cols < nx)
+        np.add.at(counts[i], (rows[inside], cols[inside]), 1)
+
+    density = {r: _disk_sums(counts, r, cell_size) for r in radii}
+    return {
+        "bbox": list(bbox),
+        "grid_bbox": list(grid_bbox),
+        "cell_size": cell_size,
+        "cell_lat": cell_lat,
+        "cell_lng": cell_lng,
+        "labels": labels,
+        "counts": counts,
+        "density": density,
+    }
+
+
+META_KEYS = ("bbox", "grid_bbox", "cell_size", "cell_lat", "cell_lng", "labels")
+
+
+def save_grid(grid, path):
+    meta = {k: grid[k] for k in META_KEYS}
+    meta["radii"] = list(grid["density"].keys())
+    arrays = {f"density_{r}": d for r, d in grid["density"].items()}
+    np.savez_compressed(path, meta=json.dumps(meta, ensure_ascii=False), counts=grid["counts"], **arrays)
+
+
+def load_grid(path):
+    data = np.load(path)
+    meta = json.loads(str(data["meta"]))
+    grid = {k: meta[k] for k in META_KEYS}
+    grid["counts"] = data["counts"]
+    grid["density"] = {r: data[f"density_{r}"] for r in meta["radii"]}
+    return grid
+
+
+# ===============================
+# 查表
+# ===============================
+def _cell_index(grid, lat, lng):
+    south, west, north, east = grid["bbox"]
+    if not (south <= lat <= north and west <= lng <= east):
+        return None
+    row = int((lat - grid["grid_bbox"][0]) / grid["cell_lat"])
+    col = int((lng - grid["grid_bbox"][1]) / grid["cell_lng"])
+    return row, col
+
+
+def lookup_counts(grid, lat, lng, radius):
+    """O(1) 取得某點周邊各類別數量
+
+    點不在 bbox 內、半徑沒有預先計算，或圓形範圍超出網格時回傳 None，由呼叫端改用即時查詢。
+    """
+    idx = _cell_index(grid, lat, lng)
+    if idx is None or radius not in grid["density"]:
+        return None
+    row, col = idx
+    ny, nx = grid["counts"].shape[-2:]
+    k = int(radius // grid["cell_size"])
+    if row - k < 0 or row + k >= ny or col - k < 0 or col + k >= nx:
+        return None
+    values = grid["density"][radius][:, row, col]
+    return {label: int(v) for label, v in zip(grid["labels"], values)}
+
+
+def format_counts(address, counts):
+    """與 format_info 相同格式，但直接吃數量"""
+    lines = [f"房屋（{address}）："]
+    for k, v in counts.items():
+        lines.append(f"- {k}: {v} 個")
+    return "\n".join(lines)
+
+
+def heatmap_points(grid, label):
+    """把某類別的原始格數量轉成 [[lat, lng, weight], ...]，給 folium HeatMap 使用
+
+    只輸出有 POI 的格子（最多與 POI 數量相同）；平滑交給 HeatMap 自己做。
+    """
+    values = grid["counts"][grid["labels"].index(label)]
+    south, west = grid["grid_bbox"][0], grid["grid_bbox"][1]
+    rows, cols = np.nonzero(values)
+    return [
+        [south + (r + 0.5) * grid["cell_lat"], west + (c + 0.5) * grid["cell_lng"], int(values[r, c])]
+        for r, c in zip(rows, cols)
+    ]
+
+
+# ===============================
+# 指令列
+# ===============================
+def main():
+    parser = argparse.ArgumentParser(description="預先計算城市生活機能密度網格")
+    parser.add_argument("--bbox", required=True, help="south,west,north,east")
+    parser.add_argument("--out", required=True, help="輸出的 .npz 檔")
+    parser.add_argument("--cache", help="POI 快取 JSON 檔（重跑時不用再查 Overpass）")
+    parser.add_argument("--cell-size", type=int, default=CELL_SIZE, help="每格邊長（公尺）")
+    parser.add_argument("--radii", default=",".join(map(str, DEFAULT_RADII)), help="預先計算的半徑（公尺）")
+    args = parser.parse_args()
+
+    bbox = tuple(float(x) for x in args.bbox.split(","))
+    radii = tuple(int(x) for x in args.radii.split(","))
+
+    pois = load_or_fetch_pois(pad_bbox(bbox, max(radii) + args.cell_size), args.cache)
+    grid = build_grid(pois, bbox, cell_size=args.cell_size, radii=radii)
+    save_grid(grid, args.out)
+
+    ny, nx = grid["counts"].shape[-2:]
+    print(f"✅ 已輸出 {args.out}（{ny} x {nx} 格，半徑 {list(radii)} 公尺）")
+    for label, points in pois.items():
+        print(f"- {label}: {len(points)} 個")
+
+
+if __name__ == "__main__":
+    main()
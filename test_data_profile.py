@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_profile
+from data_profile import column_stats, correlation_matrix, encode_column, profile_frame
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 5000
+    price = rng.normal(100, 20, n)
+    price[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "price": price,
+        "size": price * 0.5 + rng.normal(0, 5, n),
+        "city": rng.choice(["台北", "台中", "高雄", None], n),
+        "flag": rng.random(n) > 0.4,
+        "constant": np.ones(n),
+        "rooms": pd.array(rng.integers(1, 6, n), dtype="Int64"),
+    })
+
+
+def encoded_matrix(df):
+    rows = []
+    for col in df.columns:
+        kind, values, _ = encode_column(df[col])
+        rows.append(values if kind == "numeric" else np.where(values < 0, np.nan, values))
+    return np.vstack(rows)
+
+
+def test_correlation_matches_pandas(frame):
+    matrix = encoded_matrix(frame)
+    expected = pd.DataFrame(matrix.T, columns=frame.columns).corr()
+    result = correlation_matrix(matrix, frame.columns)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-12, equal_nan=True)
+
+
+def test_correlation_chunked_matches_single_pass(frame, monkeypatch):
+    matrix = encoded_matrix(frame)
+    expected = correlation_matrix(matrix, frame.columns)
+    monkeypatch.setattr(data_profile, "CORR_CHUNK_BYTES", 1000)
+    result = correlation_matrix(matrix, frame.columns)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-12, equal_nan=True)
+
+
+def test_column_stats_numeric():
+    values = np.array([1.0, 2.0, 2.0, 3.0, np.nan, 100.0])
+    stats = column_stats("numeric", values, top_k=2, bins=4)
+    assert stats["nulls"] == 1
+    assert stats["cardinality"] == 4
+    assert stats["top"][0] == (2.0, 2)
+    assert sum(stats["hist"][0]) == 5
+    assert stats["outliers"][0] == 1
+
+
+def test_column_stats_category():
+    kind, codes, labels = encode_column(pd.Series(["b", "a", None, "b", "c"]))
+    stats = column_stats(kind, codes, top_k=2)
+    assert kind == "category"
+    assert stats["nulls"] == 1
+    assert stats["cardinality"] == 3
+    assert labels[stats["top"][0][0]] == "b"
+    assert stats["top"][0][1] == 2
+
+
+def run_profile(df, **kwargs):
+    results = dict(profile_frame(df, **kwargs))
+    return results.pop(None), results
+
+
+def test_parallel_matches_in_process(frame, monkeypatch):
+    corr_seq, seq = run_profile(frame)
+    monkeypatch.setattr(data_profile, "PARALLEL_MIN_CELLS", 1)
+    corr_par, par = run_profile(frame, max_workers=2)
+    assert par == seq
+    np.testing.assert_allclose(corr_par.to_numpy(), corr_seq.to_numpy(), atol=1e-12, equal_nan=True)
+
+
+def test_falls_back_when_shared_memory_is_full(frame, monkeypatch):
+    _, expected = run_profile(frame)
+    monkeypatch.setattr(data_profile, "PARALLEL_MIN_CELLS", 1)
+    monkeypatch.setattr(data_profile, "shared_memory_fits", lambda nbytes: False)
+    monkeypatch.setattr(data_profile, "SharedMemory", None)  # 不應該建立共享記憶體
+    _, results = run_profile(frame)
+    assert results == expected
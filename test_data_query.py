@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_query import AGG_FUNCS, SORT_CACHE_SIZE, group_aggregate, prepare_frame, run_query, sort_order
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        "city": rng.choice(["台北", "台中", "高雄", None], n),
+        "name": rng.choice(["a", "b", "c", 1], n),
+        "mixed": [None if i % 7 == 0 else f"s{i}" if i % 2 else i for i in range(n)],
+        "price": rng.normal(100, 20, n),
+        "flag": rng.random(n) > 0.5,
+    })
+    return prepare_frame(df)
+
+
+@pytest.mark.parametrize("label", list(AGG_FUNCS))
+@pytest.mark.parametrize("value_col", ["name", "mixed", "price", "flag"])
+def test_group_aggregate_every_func(frame, label, value_col):
+    func = AGG_FUNCS[label]
+    if func in ("sum", "mean") and not pd.api.types.is_numeric_dtype(frame[value_col]):
+        pytest.skip("總和/平均只提供數值欄位")
+    positions = run_query(frame, [("price", "range", (80, 120))])
+    result = group_aggregate(frame, positions, ["city"], value_col, func)
+    assert len(result) == frame.iloc[positions]["city"].nunique(dropna=False)
+
+
+def test_prepare_frame_categories(frame):
+    assert isinstance(frame["city"].dtype, pd.CategoricalDtype)
+    assert isinstance(frame["name"].dtype, pd.CategoricalDtype)
+    assert frame["mixed"].dtype == object
+
+
+def test_sort_mixed_object_column(frame):
+    order = sort_order(frame, "mixed", True, OrderedDict())
+    assert sorted(order.tolist()) == list(range(len(frame)))
+    assert frame["mixed"].iloc[order[-1]] is None
+
+
+def test_sort_cache_is_bounded(frame):
+    cache = OrderedDict()
+    for col in frame.columns:
+        for ascending in (True, False):
+            sort_order(frame, col, ascending, cache)
+    assert len(cache) == SORT_CACHE_SIZE
+    assert list(cache)[-1] == ("flag", False)
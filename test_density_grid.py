@@ -0,0 +1,83 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from density_grid import OSM_TAGS, build_grid, load_grid, lookup_counts, pad_bbox, save_grid
+
+BBOX = (25.00, 121.50, 25.04, 121.54)
+RADII = (200, 500, 1000)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = 6371000
+    dlat, dlon = math.radians(lat2 - lat1), math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@pytest.fixture(scope="module")
+def pois():
+    rng = random.Random(0)
+    south, west, north, east = pad_bbox(BBOX, max(RADII) + 50)
+    return {
+        label: [("x", rng.uniform(south, north), rng.uniform(west, east)) for _ in range(3000)]
+        for label in OSM_TAGS
+    }
+
+
+@pytest.fixture(scope="module")
+def grid(pois):
+    return build_grid(pois, BBOX, radii=RADII)
+
+
+def true_count(points, lat, lng, radius):
+    return sum(haversine(lat, lng, p_lat, p_lng) <= radius for _, p_lat, p_lng in points)
+
+
+@pytest.mark.parametrize("radius", RADII)
+def test_lookup_matches_haversine(grid, pois, radius):
+    rng = random.Random(radius)
+    south, west, north, east = BBOX
+    errors, truths = [], []
+    for _ in range(60):
+        lat, lng = rng.uniform(south, north), rng.uniform(west, east)
+        estimate = lookup_counts(grid, lat, lng, radius)["餐廳"]
+        truth = true_count(pois["餐廳"], lat, lng, radius)
+        errors.append(estimate - truth)
+        truths.append(truth)
+    # 沒有系統性偏差，且平均誤差遠小於數量本身
+    assert abs(np.mean(errors)) < 1
+    assert np.mean(np.abs(errors)) < 0.1 * np.mean(truths)
+
+
+def test_lookup_at_bbox_corners_is_complete(grid, pois):
+    south, west, north, east = BBOX
+    for lat, lng in [(south, west), (south, east), (north, west), (north, east)]:
+        counts = lookup_counts(grid, lat, lng, max(RADII))
+        assert counts is not None
+        truth = true_count(pois["超商"], lat, lng, max(RADII))
+        assert abs(counts["超商"] - truth) < 0.1 * truth
+
+
+def test_lookup_returns_none_outside_or_unknown_radius(grid):
+    south, west, north, east = BBOX
+    assert lookup_counts(grid, south - 0.001, west, 200) is None
+    assert lookup_counts(grid, north, east + 0.001, 200) is None
+    assert lookup_counts(grid, (south + north) / 2, (west + east) / 2, 300) is None
+
+
+def test_save_load_round_trip(grid, tmp_path):
+    path = tmp_path / "grid.npz"
+    save_grid(grid, path)
+    loaded = load_grid(path)
+    assert loaded["labels"] == grid["labels"]
+    for key in ("bbox", "grid_bbox", "cell_size", "cell_lat", "cell_lng"):
+        assert loaded[key] == pytest.approx(grid[key])
+    np.testing.assert_array_equal(loaded["counts"], grid["counts"])
+    assert sorted(loaded["density"]) == sorted(grid["density"])
+    for radius in RADII:
+        np.testing.assert_array_equal(loaded["density"][radius], grid["density"][radius])
+    center = ((BBOX[0] + BBOX[2]) / 2, (BBOX[1] + BBOX[3]) / 2)
+    assert lookup_counts(loaded, *center, 500) == lookup_counts(grid, *center, 500)